@@ -8,27 +8,45 @@ Extracts ONLY decision-critical information for:
 Output: section-wise JSON with keys collar, sleeve, cuff, pocket, front, back, assembly.
 Each item: category, name, value, source (explicit|inferred), relevance (gauge|folder|risk|automation).
 """
+import io
+import os
 import sys
-import json
 import re
+import functools
+import orjson
 import pdfplumber
 import logging
-
-logging.basicConfig(level=logging.INFO, stream=sys.stderr, format='%(message)s')
-logger = logging.getLogger()
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+# Optional accelerator, not in requirements.txt: PyMuPDF is AGPL-licensed, so installing it is
+# a deployment decision. Without it every PDF goes through pdfplumber.
+try:
+    import pymupdf  # much faster text extraction than pdfplumber/pdfminer
+except ImportError:
+    pymupdf = None
+else:
+    # MuPDF prints its own diagnostics to stdout by default, which would corrupt the CLI's JSON
+    pymupdf.set_messages(fd=2)
+
+logger = logging.getLogger(__name__)
 
 # -------------------------------------------------------------------------
 # ALLOWED CATEGORIES (STRICT)
 # -------------------------------------------------------------------------
-ALLOWED_CATEGORIES = {"measurement", "stitch", "process", "automation", "construction_note"}
+# Category -> small int used in dedup keys (cheaper to hash than the name)
+CATEGORY_ID = {"measurement": 0, "stitch": 1, "process": 2, "automation": 3, "construction_note": 4}
+CATEGORY_NAMES = list(CATEGORY_ID)
 ALLOWED_RELEVANCE = {"gauge", "folder", "risk", "automation"}
 OUTPUT_SECTIONS = ["collar", "sleeve", "cuff", "pocket", "front", "back", "assembly"]
 
 # -------------------------------------------------------------------------
 # PATTERNS
 # -------------------------------------------------------------------------
+# Common decimal form first; groups: 1 = value, 2 = unit
 MEASUREMENT_REGEX = re.compile(
-    r"((\d+\s?/\s?\d+)|(\d+(\.\d+)?))\s?(mm|cm|\"|inch|"|')", re.IGNORECASE
+    r"(\d+(?:\.\d+)?|\d+\s?/\s?\d+)\s?(mm|cm|\"|inch|”|')", re.IGNORECASE
 )
 STITCH_REGEX = re.compile(
     r"\b(SNLS|DNCS|T/S|S/B|T\/S|S\/B|SPI|Box stitch|Lock stitch)\b", re.IGNORECASE
@@ -37,17 +55,21 @@ CONSTRUCTION_REGEX = re.compile(
     r"(back tack|double fold|clean finish|raw edge|binding|facing|hem fold)", re.IGNORECASE
 )
 AUTOMATION_REGEX = re.compile(r"(auto|pneumatic|operation|notch)", re.IGNORECASE)
+SPI_REGEX = re.compile(r"SPI\s?(\d+)", re.IGNORECASE)
+# Measurement, size and SPI patterns all need a digit; lines without one skip them
+DIGIT_REGEX = re.compile(r"\d")
 
 # Noise: do not extract these as values or as standalone names
 NOISE_VALUES = {"front", "back", "side", "collar", "pocket", "yoke", "sleeve", "cuff", "frontback"}
 # Words to strip from names to avoid ambiguous "Back", "Front", etc.
 STOP_WORDS = {"front", "back", "frontback", "assembly", "detail", "section", "item"}
 
-IGNORE_LINE_PATTERNS = [
-    r"buyer", r"style ref", r"order no", r"season", r"modified",
-    r"main label", r"size label", r"w/c label", r"barcode",
-    r"dressed", r"cotton", r"brand", r"logo", r"sheet", r"page", r"spec actual"
-]
+# Plain substrings, matched against the lowercased line
+IGNORE_LINE_TERMS = (
+    "buyer", "style ref", "order no", "season", "modified",
+    "main label", "size label", "w/c label", "barcode",
+    "dressed", "cotton", "brand", "logo", "sheet", "page", "spec actual",
+)
 
 RELEVANT_MEASUREMENT_KEYWORDS = [
     "margin", "hem", "seam", "stand", "height", "width", "placket",
@@ -62,17 +84,154 @@ RELEVANCE_MAP = {
     "smocking": "automation", "clean_finish": "folder", "double_fold": "folder",
 }
 
+# Keyword -> output section, in precedence order ("front" only counts when "back" is absent)
+SECTION_KEYWORDS = [
+    ("collar", "collar"), ("cuff", "cuff"), ("sleeve", "sleeve"), ("pocket", "pocket"),
+    ("yoke", "assembly"), ("front", "front"), ("back", "back"),
+]
+
 # Construction phrases that imply folder/template (for inference)
 FOLDER_IMPLYING = re.compile(
     r"clean finish|double fold|binding|hem|facing|raw edge|back tack", re.IGNORECASE
 )
 
 
-def _is_ignored_line(line):
-    for pat in IGNORE_LINE_PATTERNS:
-        if re.search(pat, line, re.IGNORECASE):
-            return True
-    return False
+# The worker pool only serves the slow pdfplumber path; below this many pages it costs more than it saves
+PARALLEL_MIN_PAGES = 8
+# Upper bound on pool size, whatever the machine reports
+MAX_WORKERS = 8
+
+
+def _pymupdf_open(source):
+    return pymupdf.open(stream=source, filetype="pdf") if isinstance(source, bytes) else pymupdf.open(source)
+
+
+def _plumber_open(source):
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+class PDFOpenError(Exception):
+    """Neither PyMuPDF nor pdfplumber could open the PDF."""
+
+
+def _page_rows(text):
+    """Split page text into lines, collapsing the padding spaces sort=True leaves between columns."""
+    return [" ".join(line.split()) for line in text.split("\n")]
+
+
+def _pymupdf_lines(source):
+    """
+    Text lines of the whole PDF via PyMuPDF, or None when it is not installed or fails on any page.
+    sort=True joins each visual row (label and value) into one line, as pdfplumber does; the backend
+    is chosen per document so one document never mixes the two extractors' line layouts.
+    """
+    if pymupdf is None:
+        return None
+    try:
+        with _pymupdf_open(source) as doc:
+            return [line for page in doc for line in _page_rows(page.get_text("text", sort=True))]
+    except Exception as e:
+        logger.warning(f"PyMuPDF text extraction failed, using pdfplumber: {e}")
+        return None
+
+
+def _plumber_lines(pages):
+    """Yield the text lines of already-open pdfplumber pages, one page at a time."""
+    for page in pages:
+        t = page.extract_text()
+        if t:
+            yield from t.split("\n")
+
+
+def _iter_page_lines(source, start, stop):
+    """Yield the pdfplumber text lines of pages [start, stop). source is a path or the raw PDF bytes."""
+    with _plumber_open(source) as pdf:
+        yield from _plumber_lines(pdf.pages[start:stop])
+
+
+def _page_range_lines(source, start, stop):
+    """Worker: text lines of pages [start, stop) as a list (results must be picklable)."""
+    return list(_iter_page_lines(source, start, stop))
+
+
+def _worker_count():
+    """CPUs this process may run on (not all CPUs on the host), capped at MAX_WORKERS."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS / Windows
+        cpus = os.cpu_count() or 1
+    return min(cpus, MAX_WORKERS)
+
+
+def _iter_lines(pdf_source, parallel=True):
+    """
+    Stream every text line of the PDF (path, raw bytes or file-like) in page order. PyMuPDF text is
+    cheap enough to take in one go; the pdfplumber fallback streams page by page, and with
+    parallel=True larger documents are split into page ranges extracted in a process pool,
+    yielded in order. Pass parallel=False where forking is unsafe (e.g. inside a server).
+    Raises PDFOpenError, before yielding anything, when no backend can open the file.
+    """
+    if isinstance(pdf_source, (str, os.PathLike)):
+        source = os.fspath(pdf_source)
+    elif isinstance(pdf_source, bytes):
+        source = pdf_source
+    else:
+        source = pdf_source.read()
+    lines = _pymupdf_lines(source)
+    if lines is not None:
+        yield from lines
+        return
+    try:
+        pdf = _plumber_open(source)
+    except Exception as e:
+        raise PDFOpenError(e) from e
+    # One open serves both the page count and, when the pool is not worth it, the extraction
+    with pdf:
+        n_pages = len(pdf.pages)
+        workers = min(_worker_count(), n_pages)
+        if not parallel or n_pages < PARALLEL_MIN_PAGES or workers < 2:
+            yield from _plumber_lines(pdf.pages)
+            return
+    bounds = [n_pages * i // workers for i in range(workers + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(_page_range_lines, repeat(source), bounds[:-1], bounds[1:]):
+            yield from chunk
+
+
+def read_text(data):
+    """
+    Text of an uploaded PDF (raw bytes), one line per text row. Always extracts in-process,
+    never through the worker pool, so it is safe to call from a server thread.
+    """
+    return "\n".join(_iter_lines(data, parallel=False))
+
+
+def _tokenize(lines):
+    """Yield (stripped, lowercased) for every non-blank line; this is what collector feeds take."""
+    for line in lines:
+        raw = line.strip()
+        if raw:
+            yield raw, raw.lower()
+
+
+def _first_keyword(lower, pairs):
+    """Value of the first (keyword, value) pair whose keyword occurs in lower, or None."""
+    for kw, value in pairs:
+        if kw in lower:
+            return value
+    return None
+
+
+def _section_from_line(lower):
+    """Section named by the line (SECTION_KEYWORDS precedence), or None."""
+    for kw, section in SECTION_KEYWORDS:
+        if kw in lower and not (kw == "front" and "back" in lower):
+            return section
+    return None
+
+
+def _is_ignored_line(lower):
+    return any(term in lower for term in IGNORE_LINE_TERMS)
 
 
 def _is_relevant_measurement_label(label):
@@ -86,26 +245,51 @@ def _is_relevant_measurement_label(label):
     return False
 
 
+@functools.lru_cache(maxsize=16)
+def _stop_word_regex(section):
+    """One compiled pattern for STOP_WORDS plus the section name (longest first)."""
+    words = sorted(STOP_WORDS | {section}, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + r")\b")
+
+
 def _clear_name(section, raw_name):
     """Produce unambiguous name: e.g. collar_run_stitch, cuff_hem_width. No raw 'Back'/'Front'."""
     if not raw_name or not raw_name.strip():
         return f"{section}_dimension"
-    text = raw_name.lower().strip()
-    for word in list(STOP_WORDS) + [section]:
-        text = re.sub(rf"\b{re.escape(word)}\b", "", text)
-    text = re.sub(r"[-\s]+", "_", text).strip("_")
-    text = re.sub(r"_+", "_", text)
+    text = _stop_word_regex(section).sub("", raw_name.lower().strip())
+    # Runs of hyphens/whitespace -> "_" (str.split() drops the empty pieces), then collapse "__"
+    text = "_".join(text.replace("-", " ").split())
+    while "__" in text:
+        text = text.replace("__", "_")
+    text = text.strip("_")
     if not text or text in NOISE_VALUES:
         return f"{section}_spec"
     return f"{section}_{text}" if not text.startswith(section + "_") else text
 
 
+@functools.lru_cache(maxsize=4096)
 def _relevance_from_name(name):
-    lower = name.lower()
-    for term, rel in RELEVANCE_MAP.items():
-        if term in lower:
-            return rel
-    return "risk"
+    """First RELEVANCE_MAP term (in map order) contained in name; names repeat heavily, so cached."""
+    return _first_keyword(name.lower(), RELEVANCE_MAP.items()) or "risk"
+
+
+@dataclass(slots=True, frozen=True)
+class Item:
+    """One extracted item; kept compact while parsing and turned into a JSON dict in _finalize."""
+    category: int  # CATEGORY_ID value
+    name: str
+    value: str
+    source: str
+    relevance: str
+
+    def to_dict(self):
+        return {
+            "category": CATEGORY_NAMES[self.category],
+            "name": self.name,
+            "value": self.value,
+            "source": self.source,
+            "relevance": self.relevance,
+        }
 
 
 def _add_item(results, seen, section, category, name, value, source="explicit", relevance=None):
@@ -115,32 +299,31 @@ def _add_item(results, seen, section, category, name, value, source="explicit",
         return
     if value.upper().strip() in NOISE_VALUES:
         return
-    if category not in ALLOWED_CATEGORIES:
+    cat_id = CATEGORY_ID.get(category)
+    if cat_id is None:
         return
-    clear = _clear_name(section, name)
+    clear = sys.intern(_clear_name(section, name))
     rel = relevance or _relevance_from_name(clear)
     if rel not in ALLOWED_RELEVANCE:
         rel = "risk"
-    item = {
-        "category": category,
-        "name": clear,
-        "value": str(value).strip(),
-        "source": source if source in ("explicit", "inferred") else "explicit",
-        "relevance": rel,
-    }
-    key = (item["category"], item["name"], item["value"].lower())
+    value = str(value).strip()
+    key = (cat_id, clear, value.lower())
     if key in seen:
         return
     seen.add(key)
-    results[section].append(item)
+    results[section].append(Item(
+        cat_id, clear, value,
+        source if source in ("explicit", "inferred") else "explicit", rel,
+    ))
 
 
-def _infer_from_construction_line(section, line, results, seen):
-    """Infer folder/construction_note from phrases like 'Pocket S/B clean finish'."""
-    lower = line.lower()
-    if not FOLDER_IMPLYING.search(lower):
+def _infer_from_construction_line(section, line, results, seen, match=None):
+    """
+    Infer folder/construction_note from phrases like 'Pocket S/B clean finish'.
+    match: CONSTRUCTION_REGEX match already computed for this line by the caller.
+    """
+    if not FOLDER_IMPLYING.search(line):
         return
-    match = CONSTRUCTION_REGEX.search(line)
     term = match.group(0) if match else "clean finish"
     name_part = term.replace(" ", "_").replace("-", "_")
     name = f"{section}_{name_part}" if not name_part.startswith(section) else name_part
@@ -151,47 +334,25 @@ def _infer_from_construction_line(section, line, results, seen):
     )
 
 
-def extract_from_pdf(pdf_path):
+def _section_collector():
+    """Per-line state behind extract_from_pdf. Returns (feed, finish)."""
     results = {s: [] for s in OUTPUT_SECTIONS}
     seen = set()
+    current_section = "assembly"
 
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            lines = []
-            for page in pdf.pages:
-                t = page.extract_text()
-                if t:
-                    lines.extend(t.split("\n"))
-    except Exception as e:
-        logger.error(f"PDF read failed: {e}")
-        return _finalize(results)
+    def feed(line, lower):
+        nonlocal current_section
+        if _is_ignored_line(lower):
+            return
 
-    current_section = "assembly"
-    for line in lines:
-        line = line.strip()
-        if not line or _is_ignored_line(line):
-            continue
-
-        lower = line.lower()
-        if "collar" in lower:
-            current_section = "collar"
-        elif "cuff" in lower:
-            current_section = "cuff"
-        elif "sleeve" in lower:
-            current_section = "sleeve"
-        elif "pocket" in lower:
-            current_section = "pocket"
-        elif "yoke" in lower:
-            current_section = "assembly"
-        elif "front" in lower and "back" not in lower:
-            current_section = "front"
-        elif "back" in lower:
-            current_section = "back"
-
-        for m in MEASUREMENT_REGEX.finditer(line):
+        current_section = _section_from_line(lower) or current_section
+        has_digit = DIGIT_REGEX.search(line) is not None
+
+        meas_matches = list(MEASUREMENT_REGEX.finditer(line)) if has_digit else []
+        for m in meas_matches:
             full = m.group(0)
             val = m.group(1)
-            unit = m.group(5) or ""
+            unit = m.group(2) or ""
             name_part = line.replace(full, "", 1).strip()
             if _is_relevant_measurement_label(name_part):
                 _add_item(
@@ -203,7 +364,7 @@ def extract_from_pdf(pdf_path):
         stitch_m = STITCH_REGEX.search(line)
         if stitch_m:
             val = stitch_m.group(0)
-            spi_m = re.search(r"SPI\s?(\d+)", line, re.IGNORECASE)
+            spi_m = SPI_REGEX.search(line) if has_digit else None
             if spi_m:
                 val = f"{val} (SPI {spi_m.group(1)})"
             _add_item(
@@ -237,32 +398,35 @@ def extract_from_pdf(pdf_path):
 
         if ("margin" in lower or "allowance" in lower) and ":" not in line:
             # Never output raw strings: use numeric value or short descriptor
-            meas = MEASUREMENT_REGEX.search(line)
-            value = f"{meas.group(1)}{meas.group(5) or ''}" if meas else "Margin/allowance specified"
+            meas = meas_matches[0] if meas_matches else None
+            value = f"{meas.group(1)}{meas.group(2) or ''}" if meas else "Margin/allowance specified"
             _add_item(
                 results, seen, current_section, "construction_note",
                 f"{current_section}_seam_spec", value,
                 source="explicit", relevance="gauge"
             )
 
-        _infer_from_construction_line(current_section, line, results, seen)
+        _infer_from_construction_line(current_section, line, results, seen, construction_m)
+
+    def finish():
+        return _finalize(results)
+    return feed, finish
 
-    return _finalize(results)
+
+def extract_from_pdf(lines):
+    """Section-wise construction intelligence from the PDF text lines (see _iter_lines)."""
+    feed, finish = _section_collector()
+    for raw, lower in _tokenize(lines):
+        feed(raw, lower)
+    return finish()
 
 
 def _finalize(results):
-    """Return only OUTPUT_SECTIONS with valid items. No yoke key; yoke stays in assembly."""
-    out = {s: [] for s in OUTPUT_SECTIONS}
-    for section in OUTPUT_SECTIONS:
-        items = results.get(section, [])
-        seen = set()
-        for item in items:
-            sig = (item["category"], item["name"], item["value"].lower())
-            if sig in seen:
-                continue
-            seen.add(sig)
-            out[section].append(item)
-    return out
+    """
+    Return only OUTPUT_SECTIONS with valid items, as JSON dicts. No yoke key; yoke stays in assembly.
+    Items are already deduplicated by _add_item.
+    """
+    return {s: [item.to_dict() for item in results.get(s, [])] for s in OUTPUT_SECTIONS}
 
 
 # -------------------------------------------------------------------------
@@ -280,6 +444,20 @@ COMPONENT_HEADING = re.compile(
     r"^(ASSEMBLY|REGULAR\s+CUTAWAY\s+COLLAR|SHORT\s+SLEEVE|SLEEVE|FRONT|STRAIGHT\s+BACK|BACK|STRAIGHT\s+YOKE|YOKE|POCKET|CUFF)\s*$",
     re.IGNORECASE
 )
+# Heading keyword -> component, first match in list order wins
+COMPONENT_MAP = [
+    ("assembly", "Assembly"),
+    ("regular cutaway collar", "Collar"),
+    ("short sleeve", "Sleeve"),
+    ("sleeve", "Sleeve"),
+    ("front", "Front"),
+    ("straight back", "Back"),
+    ("back", "Back"),
+    ("straight yoke", "Yoke"),
+    ("yoke", "Yoke"),
+    ("pocket", "Pocket"),
+    ("cuff", "Cuff"),
+]
 # Size label + value: XS-5cm, S-M-5.5cm, L-XL-6cm, 2XL-3XL-6.5cm
 SIZE_VALUE = re.compile(
     r"\b(XS|S|M|L|XL|2XL|3XL)\s*[-:]?\s*(\d+(?:\.\d+)?)\s*(mm|cm)?",
@@ -315,6 +493,16 @@ def _normalize_unit(val_str, unit_str):
         return round(mm / 10, 2), "cm"
     return round(mm, 2), "mm"
 
+def _cut_spans(text, matches, sep):
+    """text with the span of every match replaced by sep; matches are in order and non-overlapping (finditer)."""
+    parts = []
+    pos = 0
+    for m in matches:
+        parts.append(text[pos:m.start()])
+        pos = m.end()
+    parts.append(text[pos:])
+    return sep.join(parts)
+
 def _size_key(s):
     """Normalize size label for grading column key."""
     t = s.upper().strip()
@@ -324,106 +512,94 @@ def _size_key(s):
         return "3XL"
     return t
 
-def extract_technical_table(pdf_path):
-    """
-    Strict extraction. One category per line: A. Construction | B. Base Measurement | C. Grading.
-    Returns: { "components": [ { "component", "constructionTable", "baseMeasurementsTable", "gradingTable" } ] }
-    - constructionTable: Operation | Stitch Type | SPI/Gauge | Notes (merged, no risk/folder unless explicit)
-    - baseMeasurementsTable: Parameter | Value | Unit | Related Operation
-    - gradingTable: Parameter | XS | S | M | L | XL | 2XL | 3XL (one row per parameter)
-    """
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            lines = []
-            for page in pdf.pages:
-                t = page.extract_text()
-                if t:
-                    lines.extend(t.split("\n"))
-    except Exception as e:
-        logger.error(f"Technical table PDF read failed: {e}")
-        return {"components": []}
-
-    component_map = [
-        ("assembly", "Assembly"),
-        ("regular cutaway collar", "Collar"),
-        ("short sleeve", "Sleeve"),
-        ("sleeve", "Sleeve"),
-        ("front", "Front"),
-        ("straight back", "Back"),
-        ("back", "Back"),
-        ("straight yoke", "Yoke"),
-        ("yoke", "Yoke"),
-        ("pocket", "Pocket"),
-        ("cuff", "Cuff"),
-    ]
+def _technical_collector():
+    """Per-line state behind extract_technical_table. Returns (feed, finish)."""
     current_component = "Assembly"
     # Per-component accumulators
     construction_rows = {}  # component -> set of (operation, stitch, spi, notes)
     construction_list = {}  # component -> list of dicts (merged)
     base_meas = {}  # component -> list of { parameter, value, unit, relatedOperation }
-    grading_params = {}  # component -> { param_key -> { parameter, xs, s, m, l, xl, 2xl, 3xl } }
+    # component -> ({ parameter -> row index }, [parameter per row], { size -> [cell per row] })
+    grading_params = {}
+    SIZE_COLS = ["XS", "S", "M", "L", "XL", "2XL", "3XL"]
 
     def ensure_component(c):
         if c not in construction_list:
             construction_list[c] = []
             construction_rows[c] = set()
             base_meas[c] = []
-            grading_params[c] = {}
-
-    SIZE_COLS = ["XS", "S", "M", "L", "XL", "2XL", "3XL"]
-
-    for line in lines:
-        raw = line.strip()
-        if not raw or len(raw) > 250:
-            continue
+            grading_params[c] = ({}, [], {s: [] for s in SIZE_COLS})
+
+    # Accumulators of the selected component, rebound only when the component changes
+    selected = None
+    cur_rows = cur_construction_append = cur_base_append = None
+    cur_grading_index = cur_grading_params = cur_grading_cols = None
+
+    def select_component(c):
+        nonlocal selected, cur_rows, cur_construction_append, cur_base_append
+        nonlocal cur_grading_index, cur_grading_params, cur_grading_cols
+        ensure_component(c)
+        selected = c
+        cur_rows = construction_rows[c]
+        cur_construction_append = construction_list[c].append
+        cur_base_append = base_meas[c].append
+        cur_grading_index, cur_grading_params, cur_grading_cols = grading_params[c]
+
+    def grading_table(c):
+        _, params, cols = grading_params[c]
+        return [
+            {"parameter": p, **dict(zip(SIZE_COLS, cells))}
+            for p, *cells in zip(params, *(cols[s] for s in SIZE_COLS))
+        ]
+
+    def feed(raw, lower):
+        nonlocal current_component
+        if len(raw) > 250:
+            return
         if TECHNICAL_IGNORE.search(raw):
-            continue
-        lower = raw.lower()
+            return
 
         # STEP 1: Component only from explicit section headers
         if raw.isupper() or COMPONENT_HEADING.match(raw):
-            for key, name in component_map:
-                if key in lower:
-                    current_component = name
-                    break
-            ensure_component(current_component)
-            continue
+            current_component = _first_keyword(lower, COMPONENT_MAP) or current_component
+            if current_component != selected:
+                select_component(current_component)
+            return
 
-        ensure_component(current_component)
+        if current_component != selected:
+            select_component(current_component)
 
         # STEP 2: Classify into ONE category. Grading first (size labels = C).
-        size_matches = list(SIZE_VALUE.finditer(raw))
+        has_digit = DIGIT_REGEX.search(raw) is not None
+        size_matches = list(SIZE_VALUE.finditer(raw)) if has_digit else []
         if size_matches:
             # C. Grading: one row per parameter, all sizes in columns
-            param_candidate = raw
-            for m in size_matches:
-                param_candidate = param_candidate.replace(m.group(0), " ")
-            param_candidate = re.sub(r"\s+", " ", param_candidate).strip()
+            param_candidate = re.sub(r"\s+", " ", _cut_spans(raw, size_matches, " ")).strip()
             if len(param_candidate) > 80:
                 param_candidate = param_candidate[:80]
             if not param_candidate:
                 param_candidate = "Size"
-            param_key = (current_component, param_candidate)
-            if param_key not in grading_params[current_component]:
-                grading_params[current_component][param_key] = {
-                    "parameter": param_candidate,
-                    "XS": "", "S": "", "M": "", "L": "", "XL": "", "2XL": "", "3XL": "",
-                }
-            row = grading_params[current_component][param_key]
+            idx = cur_grading_index.get(param_candidate)
+            if idx is None:
+                idx = cur_grading_index[param_candidate] = len(cur_grading_params)
+                cur_grading_params.append(param_candidate)
+                for col in cur_grading_cols.values():
+                    col.append("")
             for m in size_matches:
                 size_lbl = _size_key(m.group(1))
                 val = m.group(2)
                 u = (m.group(3) or "").strip().lower()
                 cell = val + u if u else val
-                if size_lbl in SIZE_COLS:
-                    row[size_lbl] = cell
-            continue
+                if size_lbl in cur_grading_cols:
+                    cur_grading_cols[size_lbl][idx] = cell
+            return
 
         # A. Construction: stitch, SPI, process terms only. Merge duplicates per component.
         stitch_m = STITCH_REGEX.search(raw)
-        spi_m = re.search(r"SPI\s?(\d+)", raw, re.IGNORECASE)
+        spi_m = SPI_REGEX.search(raw) if has_digit else None
         const_m = CONSTRUCTION_REGEX.search(raw)
-        meas_in_line = MEASUREMENT_REGEX.search(raw)
+        meas_matches = list(MEASUREMENT_REGEX.finditer(raw)) if has_digit else []
+        meas_in_line = meas_matches[0] if meas_matches else None
         operation = raw
         if stitch_m:
             operation = operation.replace(stitch_m.group(0), "")
@@ -441,19 +617,19 @@ def extract_technical_table(pdf_path):
             measurement_from_line = meas_in_line.group(0).strip()
         sig = (current_component, operation, stitch_type, spi_val)
         if stitch_type or const_m:
-            if sig not in construction_rows[current_component]:
-                construction_rows[current_component].add(sig)
-                construction_list[current_component].append({
+            if sig not in cur_rows:
+                cur_rows.add(sig)
+                cur_construction_append({
                     "operation": operation,
                     "stitchType": stitch_type,
                     "spiGauge": spi_val,
                     "notes": measurement_from_line,
                 })
-            continue
+            return
 
         # B. Base Measurement: single numeric, no size labels (already handled above)
-        for m in MEASUREMENT_REGEX.finditer(raw):
-            val, unit = _normalize_unit(m.group(1), m.group(5))
+        for m in meas_matches:
+            val, unit = _normalize_unit(m.group(1), m.group(2))
             if val is None:
                 continue
             name_part = raw.replace(m.group(0), "").strip()
@@ -461,7 +637,7 @@ def extract_technical_table(pdf_path):
                 name_part = "Dimension"
             if any(skip in name_part.lower() for skip in ["buyer", "style", "order", "wash", "care", "label", "xs", "s-", "m-", "l-", "xl", "2xl", "3xl"]):
                 continue
-            base_meas[current_component].append({
+            cur_base_append({
                 "parameter": name_part[:80],
                 "value": str(val),
                 "unit": unit or "mm",
@@ -469,42 +645,45 @@ def extract_technical_table(pdf_path):
             })
             break
 
-    # Build grading table: one row per parameter with size columns
-    components_out = []
-    seen_components = set()
-    for comp in ["Assembly", "Collar", "Sleeve", "Cuff", "Front", "Back", "Yoke", "Pocket"]:
-        if comp not in construction_list and comp not in base_meas and comp not in grading_params:
-            continue
-        seen_components.add(comp)
+    def emit_component(comp):
         ensure_component(comp)
-        grading_list = []
-        for k, row in grading_params[comp].items():
-            grading_list.append({
-                "parameter": row["parameter"],
-                "XS": row["XS"], "S": row["S"], "M": row["M"], "L": row["L"],
-                "XL": row["XL"], "2XL": row["2XL"], "3XL": row["3XL"],
-            })
-        components_out.append({
+        return {
             "component": comp,
             "constructionTable": construction_list[comp],
             "baseMeasurementsTable": base_meas[comp],
-            "gradingTable": grading_list,
-        })
-    for comp in construction_list:
-        if comp not in seen_components:
-            ensure_component(comp)
-            grading_list = [
-                {"parameter": row["parameter"], "XS": row["XS"], "S": row["S"], "M": row["M"], "L": row["L"], "XL": row["XL"], "2XL": row["2XL"], "3XL": row["3XL"]}
-                for row in grading_params[comp].values()
-            ]
-            components_out.append({
-                "component": comp,
-                "constructionTable": construction_list[comp],
-                "baseMeasurementsTable": base_meas[comp],
-                "gradingTable": grading_list,
-            })
+            "gradingTable": grading_table(comp),
+        }
+
+    def finish():
+        # Known components in garment order first, then any others in first-seen order
+        components_out = []
+        seen_components = set()
+        for comp in ["Assembly", "Collar", "Sleeve", "Cuff", "Front", "Back", "Yoke", "Pocket"]:
+            if comp not in construction_list and comp not in base_meas and comp not in grading_params:
+                continue
+            seen_components.add(comp)
+            components_out.append(emit_component(comp))
+        for comp in construction_list:
+            if comp not in seen_components:
+                seen_components.add(comp)
+                components_out.append(emit_component(comp))
 
-    return {"components": components_out}
+        return {"components": components_out}
+    return feed, finish
+
+
+def extract_technical_table(lines):
+    """
+    Strict extraction. One category per line: A. Construction | B. Base Measurement | C. Grading.
+    Returns: { "components": [ { "component", "constructionTable", "baseMeasurementsTable", "gradingTable" } ] }
+    - constructionTable: Operation | Stitch Type | SPI/Gauge | Notes (merged, no risk/folder unless explicit)
+    - baseMeasurementsTable: Parameter | Value | Unit | Related Operation
+    - gradingTable: Parameter | XS | S | M | L | XL | 2XL | 3XL (one row per parameter)
+    """
+    feed, finish = _technical_collector()
+    for raw, lower in _tokenize(lines):
+        feed(raw, lower)
+    return finish()
 
 
 # -------------------------------------------------------------------------
@@ -517,12 +696,18 @@ BASE_INFO_PATTERNS = [
     (re.compile(r"style\s*ref\.?\s*[:\-]\s*(.+)", re.IGNORECASE), "styleRef"),
     (re.compile(r"fit\s*[:\-]\s*(.+)", re.IGNORECASE), "fit"),
     (re.compile(r"season\s*[:\-]\s*(.+)", re.IGNORECASE), "season"),
-    (re.compile(r"modified\s*(?:on)?\s*[:\-]\s*(.+)", re.IGNORECASE), "modified",
+    (re.compile(r"modified\s*(?:on)?\s*[:\-]\s*(.+)", re.IGNORECASE), "modified"),
 ]
+# Every pattern above needs one of these words and a ":"/"-" separator;
+# checking them on the lowercased line first skips the regexes for most lines.
+BASE_INFO_KEYWORDS = ("buyer", "no", "style", "fit", "season", "modified")
 
 
-def extract_base_info(pdf_path):
-    """Extract buyer, con no., style, fit, and other base info from the tech pack."""
+def _base_info_collector():
+    """
+    Per-line state behind extract_base_info. Returns (feed, finish).
+    feed returns True once every field is filled; later lines cannot change the result.
+    """
     result = {
         "buyer": "",
         "orderNo": "",
@@ -531,39 +716,64 @@ def extract_base_info(pdf_path):
         "season": "",
         "modified": "",
     }
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            lines = []
-            for page in pdf.pages:
-                t = page.extract_text()
-                if t:
-                    lines.extend(t.split("\n"))
-    except Exception as e:
-        logger.error(f"Base info PDF read failed: {e}")
-        return result
 
-    for line in lines:
-        raw = line.strip()
-        if not raw or len(raw) > 200:
-            continue
+    def feed(raw, lower):
+        if len(raw) > 200 or (":" not in raw and "-" not in raw):
+            return
+        if not any(kw in lower for kw in BASE_INFO_KEYWORDS):
+            return
         for pattern, key in BASE_INFO_PATTERNS:
             m = pattern.search(raw)
             if m:
                 val = m.group(1).strip()
                 if val and not result[key]:
                     result[key] = val[:120]
+                    return all(result.values())
                 break
 
-    return result
+    def finish():
+        return result
+    return feed, finish
+
+
+def extract_base_info(lines):
+    """Extract buyer, con no., style, fit, and other base info from the tech pack lines."""
+    feed, finish = _base_info_collector()
+    for raw, lower in _tokenize(lines):
+        if feed(raw, lower):
+            break
+    return finish()
+
+
+def extract_all(lines):
+    """
+    Run all three extractors over the lines in a single pass.
+    A collector whose feed reports it is done stops receiving lines.
+    Returns the section-wise output plus "technicalTable" and "baseInformation".
+    """
+    collectors = [_section_collector(), _technical_collector(), _base_info_collector()]
+    feeds = [feed for feed, _ in collectors]
+    for raw, lower in _tokenize(lines):
+        for feed in feeds:
+            if feed(raw, lower):
+                feeds = [f for f in feeds if f is not feed]
+    data, technical_table, base_info = (finish() for _, finish in collectors)
+    return {**data, "technicalTable": technical_table, "baseInformation": base_info}
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, format='%(message)s')
     if len(sys.argv) < 2:
         logger.error("Usage: python advanced_parser.py <pdf_path>")
         sys.exit(1)
     pdf_path = sys.argv[1]
-    data = extract_from_pdf(pdf_path)
-    technical_table = extract_technical_table(pdf_path)
-    base_info = extract_base_info(pdf_path)
-    out = {**data, "technicalTable": technical_table, "baseInformation": base_info}
-    print(json.dumps(out, indent=2, default=str))
+    # Only a file that cannot be opened falls back to empty output; extraction errors propagate
+    try:
+        out = extract_all(_iter_lines(pdf_path))
+    except PDFOpenError as e:
+        logger.error(f"PDF read failed: {e}")
+        out = extract_all(())
+    sys.stdout.buffer.write(orjson.dumps(
+        out, default=str,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+    ))
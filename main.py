@@ -1,6 +1,10 @@
+import hashlib
+from collections import OrderedDict
+
 from fastapi import FastAPI, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-import pdfplumber
+from advanced_parser import read_text
 from techpack_parser import parse_techpack
 
 app = FastAPI()
@@ -12,12 +16,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Content hash of an upload -> parsed result, so re-uploads of the same PDF skip parsing
+RESULT_CACHE_SIZE = 256
+_result_cache = OrderedDict()
+
 @app.post("/analyze-techpack")
 async def analyze(file: UploadFile = File(...)):
-    text = ""
-    with pdfplumber.open(file.file) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
+    data = await file.read()
+    key = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if key in _result_cache:
+        _result_cache.move_to_end(key)
+        return _result_cache[key]
 
-    parsed = parse_techpack(text)
+    # PDF extraction is blocking; keep it off the event loop
+    parsed = parse_techpack(await run_in_threadpool(read_text, data))
+    _result_cache[key] = parsed
+    if len(_result_cache) > RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
     return parsed